@@ -1,15 +1,12 @@
 import pulumi
 import pulumi_kubernetes as k
-from app import KubernetesService,KubernetesServiceArgs
+from app import EnvSpec,KubernetesService,KubernetesServiceArgs
+from xpulumi import get_stack_reference, require_outputs
+from xpulumi.context import envName, config, BASE_TAGS
 
-envName = pulumi.get_stack()
-config = pulumi.Config()
-# vpc_stack = pulumi.StackReference('organization/vpc/vpc-demo')
-k8s_stack = pulumi.StackReference('organization/eks/eks-demo')
-db_stack = pulumi.StackReference('organization/db/db-demo')
-BASE_TAGS = {
-    'Environment': envName
-}
+# vpc_stack = get_stack_reference('organization/vpc/vpc-demo')
+k8s_stack = get_stack_reference('organization/eks/eks-demo')
+db_stack = get_stack_reference('organization/db/db-demo')
 
 ns = k.core.v1.Namespace(
     f"{envName}-ns",
@@ -18,12 +15,17 @@ ns = k.core.v1.Namespace(
     )
 )
 
-default_secrets={
-    'DB_USERNAME': db_stack.require_output('db_admin_username'),
-    'DB_PASSWORD': db_stack.require_output('db_admin_password')
-   # 'DB_USERNAME': db_stack.require_output('db_proxy_username'),
-   # 'DB_PASSWORD': db_stack.require_output('db_proxy_password')
-}
+db_credentials = require_outputs(db_stack, 'db_admin_username', 'db_admin_password')
+default_secrets = db_credentials.apply(lambda c: {
+    'DB_USERNAME': c['db_admin_username'],
+    'DB_PASSWORD': c['db_admin_password']
+})
+# db_credentials = require_outputs(db_stack, 'db_proxy_username', 'db_proxy_password')
+
+env_specs = tuple(
+    EnvSpec(name=k, value=v)
+    for k, v in (config.get_object('app_environment_variables') or {}).items()
+)
 
 app = KubernetesService(
     f"{envName}-app",
@@ -31,7 +33,7 @@ app = KubernetesService(
         base_tags=BASE_TAGS,
         app_name='demoapp',
         container_ports=[3000],
-        environment_variables=config.get_object('app_environment_variables'),
+        environment_variables=env_specs,
         hostname_list=config.get_object('app_hostnames'),
         image=config.require('app_image'),
         ingress_port=3000,
@@ -41,10 +43,10 @@ app = KubernetesService(
         namespace=ns.metadata.name,
         openid_connector=k8s_stack.require_output('cluster_openid_connector'),
         public_load_balancer=k8s_stack.require_output('cluster_public_load_balancer'),
-        secrets_data={
-            **default_secrets,
-            **config.get_object('app_secrets')
-        },
+        secrets_data=pulumi.Output.all(
+            default_secrets,
+            config.get_object('app_secrets')
+        ).apply(lambda s: {**s[0], **s[1]}),
         service_permissions=[]
     )
 )
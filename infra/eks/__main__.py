@@ -1,13 +1,10 @@
 import pulumi
 from certs import Certs, CertArgs
 from eks import EKS,EksArgs
+from xpulumi import get_stack_reference
+from xpulumi.context import envName, config, BASE_TAGS
 
-envName = pulumi.get_stack()
-config = pulumi.Config()
-vpc_stack = pulumi.StackReference('organization/vpc/vpc-demo')
-BASE_TAGS = {
-    'Environment': envName
-}
+vpc_stack = get_stack_reference('organization/vpc/vpc-demo')
 
 certificate = Certs(
     f"{envName}-certs",
@@ -15,24 +12,26 @@ certificate = Certs(
         alt_names=[],
         base_tags=BASE_TAGS,
         domain_name=config.require('cert_domain_name'),
+        zone_id=config.get('cert_zone_id'),
     )
 )
 
 eks_images = config.require_object('eks_images')
+eks_version = config.require('eks_version')
 cluster = EKS(
     f"{envName}-k",
     EksArgs(
         base_tags=BASE_TAGS,
         default_certificate_arn=certificate.cert.arn,
-        eks_version=config.require('eks_version'),
+        eks_version=eks_version,
         #on_demand_base_capacity=config.get('eks_on_demand_base_capacity'),
         #on_demand_percentage_above_base_capacity=config.get(
         #    'eks_on_demand_percentage_above_base_capacity'),
-        private_subnet_ids=vpc_stack.require_output('private_subnet_ids').apply(lambda ps: ps),
+        private_subnet_ids=vpc_stack.require_output('private_subnet_ids'),
         public_endpoint=True,
-        public_subnet_ids=vpc_stack.require_output('public_subnet_ids').apply(lambda ps: ps),
-        vpc_id=vpc_stack.require_output('vpc_id').apply(lambda v: v),
-        worker_image_id=eks_images.get(config.get('eks_version', '1.27')),
+        public_subnet_ids=vpc_stack.require_output('public_subnet_ids'),
+        vpc_id=vpc_stack.require_output('vpc_id'),
+        worker_image_id=eks_images.get(eks_version),
         worker_instance_type=config.require('eks_worker_instance_type'),
         worker_key_name=config.require('eks_key_pair'),
         worker_max_size=config.get('eks_worker_max_size'),
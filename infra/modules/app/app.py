@@ -1,20 +1,35 @@
+from dataclasses import dataclass
 from typing import Any, Mapping, Optional, Sequence
+import json
 import pulumi
 import pulumi_aws as aws
 import pulumi_kubernetes as k8s
+from xpulumi import get_zone
+
+
+@dataclass(frozen=True)
+class EnvSpec:
+    """
+    A container environment variable, parsed once from the stack config.
+    """
+    __slots__ = ('name', 'value')
+
+    name: str
+    value: pulumi.Input[str]
+
 
 class KubernetesServiceArgs:
     def __init__(self,
                  base_tags: Mapping[str,str],
                  app_name: str,
                  container_ports: Sequence[int],
-                 environment_variables: Mapping[Any, Any],
+                 environment_variables: Sequence[EnvSpec],
                  image: pulumi.Input[str],
                  kube_issuer: pulumi.Input[str],
                  namespace: pulumi.Input[str],
-                 openid_connector: str,
+                 openid_connector: pulumi.Input[str],
                  public_load_balancer: pulumi.Input[str],
-                 secrets_data: Mapping[Any, Any],
+                 secrets_data: pulumi.Input[Mapping[Any, Any]],
                  service_permissions: Sequence[aws.iam.GetPolicyDocumentStatementArgs],
                  hostname_list: Sequence[Any],
                  min_replicas: pulumi.Input[int] = 1,
@@ -62,6 +77,10 @@ class KubernetesService(pulumi.ComponentResource):
         self.hostname_list = args.hostname_list
         self.ingress_port = args.ingress_port
 
+        # Options shared by every child resource of the component
+        child_opts = pulumi.ResourceOptions(parent=self)
+        # Common prefix of the child resource names
+        prefix = self.name + "-"
 
         if len(self.service_permissions) > 0:
             policy_doc = aws.iam.get_policy_document(
@@ -69,53 +88,60 @@ class KubernetesService(pulumi.ComponentResource):
             )
 
             self.policy = aws.iam.Policy(
-                f"{self.name}-policy",
+                prefix + "policy",
                 policy=policy_doc.json,
                 tags=self.base_tags,
-                opts=pulumi.ResourceOptions(
-                    parent=self
-                )
+                opts=child_opts
             )
 
-        service_role_assume_policy = aws.iam.get_policy_document(
-            statements=[
-                aws.iam.GetPolicyDocumentStatementArgs(
-                    effect="Allow",
-                    principals=[
-                        aws.iam.GetPolicyDocumentStatementPrincipalArgs(
-                            identifiers=[self.openid_connector],
-                            type='Federated'
-                        )
-                    ],
-                    actions=['sts:AssumeRoleWithWebIdentity'],
-                    conditions=[
-                        aws.iam.GetPolicyDocumentStatementConditionArgs(
-                           test="StringEquals",
-                            variable=self.kube_issuer.apply(lambda ki: f"{ki.replace('https://', '')}:sub"),
-                            values=[
-                                self.namespace.apply(lambda ns: f"system:serviceaccount:{ns}:{self.name}")
-                            ]
-                        )
-                    ]
-                )
+        # The trust policy depends on three Outputs; resolve them together and
+        # render the document locally, its shape never changes so there is
+        # no need for a get_policy_document round-trip to the provider
+        service_role_assume_policy = pulumi.Output.all(
+            issuer=self.kube_issuer,
+            namespace=self.namespace,
+            openid_connector=self.openid_connector
+        ).apply(lambda p: json.dumps({
+            "Version": "2012-10-17",
+            "Statement": [
+                {
+                    "Effect": "Allow",
+                    "Principal": {
+                        "Federated": p['openid_connector']
+                    },
+                    "Action": "sts:AssumeRoleWithWebIdentity",
+                    "Condition": {
+                        "StringEquals": {
+                            f"{p['issuer'].replace('https://', '')}:sub":
+                                f"system:serviceaccount:{p['namespace']}:{self.name}"
+                        }
+                    }
+                }
             ]
-        )
+        }))
 
         self.service_role = aws.iam.Role(
-            f"{self.name}-role",
-            assume_role_policy=service_role_assume_policy.json,
-            name=f"{self.name}-role",
+            prefix + "role",
+            assume_role_policy=service_role_assume_policy,
+            name=prefix + "role",
             tags=self.base_tags,
-            opts=pulumi.ResourceOptions(
-                parent=self
-            )
+            opts=child_opts
         )
+
+        if len(self.service_permissions) > 0:
+            aws.iam.RolePolicyAttachment(
+                prefix + "roleattach",
+                role=self.service_role.name,
+                policy_arn=self.policy.arn,
+                opts=child_opts
+            )
+
         ## Kubernetes resources ##
 
 
         # Service account
         self.sa = k8s.core.v1.ServiceAccount(
-            f"{self.name}-sa",
+            prefix + "sa",
             metadata=k8s.meta.v1.ObjectMetaArgs(
                 annotations={
                     "eks.amazonaws.com/role-arn": self.service_role.arn
@@ -123,39 +149,49 @@ class KubernetesService(pulumi.ComponentResource):
                 name=self.name,
                 namespace=self.namespace
             ),
-            opts=pulumi.ResourceOptions(
-                parent=self
-            )
+            opts=child_opts
         )
 
-
-        if len(self.service_permissions) > 0:
-            aws.iam.RolePolicyAttachment(
-                f"{self.name}-roleattach",
-                role=self.service_role.name,
-                policy_arn=self.policy.arn,
-                opts=pulumi.ResourceOptions(
-                    parent=self
-                )
-            )
         # Secrets
 
         self.secrets = k8s.core.v1.Secret(
-            f"{self.name}-secrets",
+            prefix + "secrets",
             metadata=k8s.meta.v1.ObjectMetaArgs(
                 name=f"{self.name}",
                 namespace=self.namespace
             ),
-            string_data=self.secrets_data,
-            opts=pulumi.ResourceOptions(
-                parent=self
-            )
+            # Resolve the whole payload as a single Output, whether it is given
+            # as a mapping of Outputs or as an Output of a mapping
+            string_data=pulumi.Output.from_input(self.secrets_data),
+            opts=child_opts
         )
 
         # Deployment
 
+        # Container arguments are built once up front; the port names are
+        # shared by the container and the service definitions
+        port_names = [(p, f"{p}-tcp") for p in self.container_ports]
+        container_env = [
+            k8s.core.v1.EnvVarArgs(
+                name=e.name,
+                value=e.value
+            ) for e in self.environment_variables
+        ]
+        container_ports = [
+            k8s.core.v1.ContainerPortArgs(
+                name=n,
+                container_port=p
+            ) for p, n in port_names
+        ]
+        service_ports = [
+            k8s.core.v1.ServicePortArgs(
+                port=p,
+                name=n
+            ) for p, n in port_names
+        ]
+
         self.deployment = k8s.apps.v1.Deployment(
-            f"{self.name}-deployment",
+            prefix + "deployment",
             metadata=k8s.meta.v1.ObjectMetaArgs(
                 labels={
                     "app.kubernetes.io/name": self.name
@@ -180,11 +216,7 @@ class KubernetesService(pulumi.ComponentResource):
                         containers=[
                             k8s.core.v1.ContainerArgs(
                                 name=self.app_name,
-                                env=[
-                                    k8s.core.v1.EnvVarArgs(
-                                        name=k,
-                                        value=v
-                                    ) for k, v in self.environment_variables.items()],
+                                env=container_env,
                                 env_from=[
                                     k8s.core.v1.EnvFromSourceArgs(
                                         secret_ref=k8s.core.v1.SecretEnvSourceArgs(
@@ -194,26 +226,19 @@ class KubernetesService(pulumi.ComponentResource):
                                 ],
                                 image=self.image,
                                 image_pull_policy="Always",
-                                ports=[
-                                    k8s.core.v1.ContainerPortArgs(
-                                        name=f"{p}-tcp",
-                                        container_port=p
-                                    ) for p in self.container_ports
-                                ]
+                                ports=container_ports
                             )
                         ],
                         service_account_name=self.sa.metadata.name
                     )
                 )
             ),
-            opts=pulumi.ResourceOptions(
-                parent=self
-            )
+            opts=child_opts
         )
 
         # Autoscaling
         self.autoscaling = k8s.autoscaling.v2.HorizontalPodAutoscaler(
-            f"{self.name}-app-hpa",
+            prefix + "app-hpa",
             metadata=k8s.meta.v1.ObjectMetaArgs(
                 labels={
                     "app.kubernetes.io/name": self.name
@@ -252,15 +277,13 @@ class KubernetesService(pulumi.ComponentResource):
                     )
                 ]
             ),
-            opts=pulumi.ResourceOptions(
-                parent=self
-            )
+            opts=child_opts
         )
 
         # Service
 
         self.service = k8s.core.v1.Service(
-            f"{self.name}-service",
+            prefix + "service",
             metadata=k8s.meta.v1.ObjectMetaArgs(
                 labels={
                     "app.kubernetes.io/name": self.name
@@ -269,30 +292,25 @@ class KubernetesService(pulumi.ComponentResource):
                 namespace=self.namespace
             ),
             spec=k8s.core.v1.ServiceSpecArgs(
-                ports=[
-                    k8s.core.v1.ServicePortArgs(
-                        port=p,
-                        name=f"{p}-tcp"
-                    ) for p in self.container_ports
-                ],
+                ports=service_ports,
                 selector={
                     "app.kubernetes.io/name": self.name
                 }
             ),
-            opts=pulumi.ResourceOptions(
-                parent=self
-            )
+            opts=child_opts
         )
 
         # Ingress
         # Requires Traefik chart
         self.records = []
         if len(self.hostname_list) > 0:
-            hosts = ",".join(
-                [f"`{h['name']}`" for h in self.hostname_list]
-            )
+            # Host names may come from other stacks as Outputs, so the Traefik
+            # rule is rendered in a single apply once all of them are known
+            host_rule = pulumi.Output.all(
+                *(h['name'] for h in self.hostname_list)
+            ).apply(lambda names: "Host(" + ",".join(f"`{n}`" for n in names) + ")")
             self.ingress = k8s.apiextensions.CustomResource(
-                f"{self.name}-ing",
+                prefix + "ing",
                 api_version="traefik.containo.us/v1alpha1",
                 kind="IngressRoute",
                 metadata=k8s.meta.v1.ObjectMetaArgs(
@@ -304,7 +322,7 @@ class KubernetesService(pulumi.ComponentResource):
                     "routes": [
                         {
                             'kind': 'Rule',
-                            'match': f"Host({hosts})",
+                            'match': host_rule,
                             'priority': 10,
                             'services': [
                                 {
@@ -319,26 +337,29 @@ class KubernetesService(pulumi.ComponentResource):
                         }
                     ]
                 },
-                opts=pulumi.ResourceOptions(
-                    parent=self
-                )
+                opts=child_opts
             )
 
-            for nrec, rec in enumerate(self.hostname_list):
-                # A dns record will be created for each of these unless `create_record = False`
-                if rec.get('create_record', True):
-                    hz = aws.route53.get_zone(
-                        name='cloudlan.net'
-                    )
-                    self.records.append(aws.route53.Record(
-                        f"{self.name}-record{nrec}",
+            # A dns record will be created for each of these unless `create_record = False`.
+            # The hostname's position in the list is kept, it is part of the
+            # record's resource name
+            creatable = tuple(
+                (nrec, h['name']) for nrec, h in enumerate(self.hostname_list)
+                if h.get('create_record', True)
+            )
+            if creatable:
+                hz = get_zone('cloudlan.net')
+                # The records only depend on the zone and the load balancer, never on
+                # each other, so they are registered as one batch the engine can
+                # create in parallel.
+                self.records = [
+                    aws.route53.Record(
+                        prefix + "record" + str(nrec),
                         zone_id=hz.zone_id,
-                        name=rec['name'],
+                        name=host,
                         type='CNAME',
                         ttl=300,
                         records=[self.public_load_balancer],
-                        opts=pulumi.ResourceOptions(
-                            parent=self
-                        )
-                    ))
-
+                        opts=child_opts
+                    ) for nrec, host in creatable
+                ]
@@ -1,10 +1,11 @@
 """
 Contains a Pulumi ComponentResource for creating the certificates
 """
-from typing import Mapping, Sequence
+from typing import Mapping, Optional, Sequence
 
 import pulumi
 import pulumi_aws as aws
+from xpulumi import get_zone
 
 
 class CertArgs:
@@ -16,18 +17,22 @@ class CertArgs:
                  alt_names: pulumi.Input[Sequence[pulumi.Input[str]]],
                  base_tags: Mapping[str, str],
                  domain_name: pulumi.Input[str],
-                 zone_name: pulumi.Input[str] = 'cloudlan.net'):
+                 zone_name: pulumi.Input[str] = 'cloudlan.net',
+                 zone_id: Optional[pulumi.Input[str]] = None):
         """
         Constructs a CertArgs.
 
         :param alt_names: Aternative domains for certificates.
         :param base_tags: Tags which are applied to all taggable resources.
         :param domain_name: Full fqdn for certificate
+        :param zone_name: Route53 hosted zone where the validation records are created
+        :param zone_id: Id of `zone_name`, when known the zone lookup is skipped
         """
         self.alt_names = alt_names
         self.base_tags = base_tags
         self.domain_name = domain_name
         self.zone_name = zone_name
+        self.zone_id = zone_id
 
 
 class Certs(pulumi.ComponentResource):
@@ -55,41 +60,49 @@ class Certs(pulumi.ComponentResource):
         self.base_tags = args.base_tags
         self.domain_name = args.domain_name
         self.zone_name = args.zone_name
-        self.zone_id = aws.route53.get_zone(name=self.zone_name).zone_id
+        self.zone_id = args.zone_id
+        if self.zone_id is None:
+            self.zone_id = get_zone(self.zone_name).zone_id
+
+        # Options shared by the child resources of the component
+        child_opts = pulumi.ResourceOptions(parent=self)
 
         self.cert = aws.acm.Certificate(f'{name}-certificate',
             domain_name=self.domain_name,
             subject_alternative_names=self.alt_names,
             tags=self.base_tags,
             validation_method="DNS",
-            opts=pulumi.ResourceOptions(
-                parent=self
-            )
+            opts=child_opts
         )
 
-        self.dvo_records = self.cert.domain_validation_options.apply(lambda e: iterate_records(e))
-        # pulumi.info(self.dvo_records)
+        cert_opts = pulumi.ResourceOptions(parent=self.cert)
+
+        # Validation record names are fully qualified, e.g. `_abc.cloudlan.net.`
+        zone_suffix = f".{self.zone_name}."
 
         def iterate_records(dvo):
             dvo_records = []
             for num, f in enumerate(dvo):
-                if self.zone_name in f.resource_record_name:
+                if f.resource_record_name.endswith(zone_suffix):
                     dvo_records.append(aws.route53.Record(
                         f'{self.name}-dvo-records-{num}',
                         allow_overwrite=True,
-                        name=f.resource_record_name.replace(f".{self.zone_name}.",''),
+                        name=f.resource_record_name[:-len(zone_suffix)],
                         ttl=300,
                         type=f.resource_record_type,
                         records=[
                             f.resource_record_value
                         ],
                         zone_id=self.zone_id,
-                        opts=pulumi.ResourceOptions(
-                            parent=self.cert
-                        )
+                        opts=cert_opts
                     ))
             return dvo_records
 
- 
+        # The validation options are only known once the certificate request
+        # exists, and AWS does not guarantee their order, so the records
+        # are matched to the zone inside the apply
+        self.dvo_records = self.cert.domain_validation_options.apply(iterate_records)
+        # pulumi.info(self.dvo_records)
+
         super().register_outputs({})
 
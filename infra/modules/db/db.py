@@ -2,12 +2,44 @@
 Contains a Pulumi ComponentResource for creating the infra resources for Databases.
 """
 import json
+import types
 from typing import Mapping, Sequence
 
 import pulumi
 import pulumi_aws as aws
 import pulumi_random as random
 
+from xpulumi import get_rds_certificate, get_zone
+
+# Lets the RDS proxy assume its role
+_ASSUME_ROLE_POLICY = json.dumps({
+    "Version": "2012-10-17",
+    "Statement": [{
+        "Action": "sts:AssumeRole",
+        "Effect": "Allow",
+        "Sid": "RoleAssume",
+        "Principal": {
+            "Service": "rds.amazonaws.com",
+        },
+    }],
+})
+
+# Secrets Manager actions the RDS proxy needs on its credentials secret
+_SECRET_ACCESS_ACTIONS = (
+    "secretsmanager:GetRandomPassword",
+    "secretsmanager:CreateSecret",
+    "secretsmanager:ListSecrets",
+    "secretsmanager:GetSecretValue"
+)
+
+_KMS_DECRYPT_STATEMENT = {
+    "Action": [
+        "kms:Decrypt"
+    ],
+    "Effect": "Allow",
+    "Resource": "*"
+}
+
 
 class RdsDbArgs:
     """
@@ -16,12 +48,12 @@ class RdsDbArgs:
 
     def __init__(self,
                  base_tags: Mapping[str, str],
-                 cidr_blocks: Sequence[pulumi.Input[str]],
+                 cidr_blocks: pulumi.Input[Sequence[pulumi.Input[str]]],
                  major_version: pulumi.Input[str],
-                 private_subnets: Sequence[pulumi.Input[str]],
+                 private_subnets: pulumi.Input[Sequence[pulumi.Input[str]]],
                  vpc_id: pulumi.Input[str],
                  zone_name: pulumi.Input[str],
-                 is_prod_database: pulumi.Input[bool] = False,
+                 is_prod_database: bool = False,
                  serverless_max_capacity: pulumi.Input[int] = 3,
                  storage_size: pulumi.Input[int] = 20):
         """
@@ -68,46 +100,43 @@ class RdsDb(pulumi.ComponentResource):
 
         # Make base info available to other methods
         self.name = name
-        self.base_tags = args.base_tags
-        self.cidr_blocks = args.cidr_blocks
+        # Read-only view shared by every tagged child resource
+        self.base_tags = types.MappingProxyType(dict(args.base_tags))
+        # Resolved once and shared by every resource consuming them
+        self.cidr_blocks = pulumi.Output.from_input(args.cidr_blocks)
+        # Decides plain arguments of the cluster below, so it cannot be an Output
+        if isinstance(args.is_prod_database, pulumi.Output):
+            raise TypeError("is_prod_database must be a bool, not an Output")
         self.is_prod_database = args.is_prod_database
         self.major_version = args.major_version
-        self.private_subnets = args.private_subnets
+        self.private_subnets = pulumi.Output.from_input(args.private_subnets)
         self.storage_size = args.storage_size
         self.vpc_id = args.vpc_id
         self.zone_name = args.zone_name
-        self.zone_id = aws.route53.get_zone(name=self.zone_name).zone_id
+        self.zone_id = get_zone(self.zone_name).zone_id
 
-        # Major version - Minor version dictionary
-        db_versions = {
-            # '8.0': '8.0.36'
-            '8.0': '3.06'
-        }
+        # Options shared by every child resource of the component
+        child_opts = pulumi.ResourceOptions(parent=self)
 
-        self.latest_cert = aws.rds.get_certificate(
-            id="rds-ca-rsa2048-g1"
-        )
+        # Resolved as an Output so the lookup does not hold up the child
+        # registrations below, and shared by every RdsDb in the program
+        self.latest_cert = get_rds_certificate("rds-ca-rsa2048-g1")
 
-        self.db_parameter_group = {}
-        for v in db_versions.keys():
-            self.db_parameter_group[v] = aws.rds.ParameterGroup(
-                f"{self.name}-db-mysql-{v}",
-                family=f"aurora-mysql{v}",
-                name=f"mysql{v.replace('.', '')}",
-                tags=self.base_tags,
-                opts=pulumi.ResourceOptions(
-                    parent=self
-                )
-            )
+        # Matches the engine_version of the cluster below
+        self.db_parameter_group = aws.rds.ParameterGroup(
+            f"{self.name}-db-mysql-8.0",
+            family="aurora-mysql8.0",
+            name="mysql80",
+            tags=self.base_tags,
+            opts=child_opts
+        )
         
         self.db_subnet = aws.rds.SubnetGroup(
             f"{self.name}-db-subnet",
             description="Mysql db subnet",
             subnet_ids=self.private_subnets,
             tags=self.base_tags,
-            opts=pulumi.ResourceOptions(
-                parent=self
-            )
+            opts=child_opts
         )
 
         self.db_security_group = aws.ec2.SecurityGroup(
@@ -131,18 +160,16 @@ class RdsDb(pulumi.ComponentResource):
             ],
             vpc_id=self.vpc_id,
             tags=self.base_tags,
-            opts=pulumi.ResourceOptions(
-                parent=self
-            )
+            opts=child_opts
         )
 
         self.db_password = random.RandomPassword(
             f"{self.name}-db-mysql-password",
             length=32,
             special=False,
-            opts=pulumi.ResourceOptions(
-                parent=self,
-                additional_secret_outputs=['result']
+            opts=pulumi.ResourceOptions.merge(
+                child_opts,
+                pulumi.ResourceOptions(additional_secret_outputs=['result'])
             )
         )
         
@@ -157,7 +184,6 @@ class RdsDb(pulumi.ComponentResource):
             db_subnet_group_name=self.db_subnet.name,
             engine="aurora-mysql",
             engine_mode="provisioned",
-            # engine_version=db_versions[self.major_version],
             engine_version="8.0.mysql_aurora.3.06.0",
             final_snapshot_identifier=f"{self.name}-db-cluster" if self.is_prod_database else None,
             master_username='root',
@@ -170,9 +196,7 @@ class RdsDb(pulumi.ComponentResource):
             vpc_security_group_ids=[self.db_security_group.id],
             storage_encrypted=True,
             tags=self.base_tags,
-            opts=pulumi.ResourceOptions(
-                parent=self
-            )
+            opts=child_opts
         )
 
         self.db_cluster_instance = aws.rds.ClusterInstance(
@@ -184,9 +208,7 @@ class RdsDb(pulumi.ComponentResource):
             engine=self.serverless_db.engine,
             engine_version=self.serverless_db.engine_version,
             tags=self.base_tags,
-            opts=pulumi.ResourceOptions(
-                parent=self
-            )
+            opts=child_opts
         )
 
 
@@ -196,72 +218,46 @@ class RdsDb(pulumi.ComponentResource):
             f"{self.name}-db-proxy-secret",
             description="Secret for the RDS proxy",
             tags=self.base_tags,
-            opts=pulumi.ResourceOptions(
-                parent=self
-            )
-        )
-        
-        self.db_proxy_secret_version = aws.secretsmanager.SecretVersion(
-            f"{self.name}-db-proxy-secret",
-            secret_id=self.db_proxy_secret.id,
-            secret_string=self.db_password.result.apply(lambda p: json.dumps({
-                "username": "root",
-                "password": p
-            })),
-            opts=pulumi.ResourceOptions(
-                parent=self
-            )
+            opts=child_opts
         )
 
         db_proxy_role = aws.iam.Role(
             f"{self.name}-db-proxy-role",
             name=f"{self.name}-db-proxy-role",
-            assume_role_policy=json.dumps({
+            assume_role_policy=_ASSUME_ROLE_POLICY,
+            opts=child_opts
+        )
+
+        # Kept out of the role so the role does not wait on the secret, only
+        # the policy does
+        db_proxy_role_policy = aws.iam.RolePolicy(
+            f"{self.name}-db-proxy-role-policy",
+            name="SecretManagerAccess",
+            role=db_proxy_role.id,
+            policy=pulumi.Output.json_dumps({
                 "Version": "2012-10-17",
-                "Statement": [{
-                    "Action": "sts:AssumeRole",
-                    "Effect": "Allow",
-                    "Sid": "RoleAssume",
-                    "Principal": {
-                        "Service": "rds.amazonaws.com",
+                "Statement": [
+                    {
+                        "Action": _SECRET_ACCESS_ACTIONS,
+                        "Effect": "Allow",
+                        "Resource": [self.db_proxy_secret.arn]
                     },
-                }],
+                    _KMS_DECRYPT_STATEMENT
+                ]
             }),
-            inline_policies=[
-                aws.iam.RoleInlinePolicyArgs(
-                    name="SecretManagerAccess",
-                    policy=self.db_proxy_secret.arn.apply(
-                        lambda arn:
-                        json.dumps(
-                            {
-                                "Version": "2012-10-17",
-                                "Statement": [
-                                    {
-                                        "Action": [
-                                            "secretsmanager:GetRandomPassword",
-                                            "secretsmanager:CreateSecret",
-                                            "secretsmanager:ListSecrets",
-                                            "secretsmanager:GetSecretValue"
-                                        ],
-                                        "Effect": "Allow",
-                                        "Resource": [arn]
-                                    },
-                                    {
-                                        "Action": [
-                                            "kms:Decrypt"
-                                        ],
-                                        "Effect": "Allow",
-                                        "Resource": "*"
-                                    }
-                                ]
-                            }
-                        )
-                    )
-                )
-            ],
-            opts=pulumi.ResourceOptions(
-                parent=self
-            )
+            opts=child_opts
+        )
+
+        # The credentials only depend on the password, so they are written
+        # independently of the IAM branch above
+        self.db_proxy_secret_version = aws.secretsmanager.SecretVersion(
+            f"{self.name}-db-proxy-secret",
+            secret_id=self.db_proxy_secret.id,
+            secret_string=pulumi.Output.json_dumps({
+                "username": "root",
+                "password": self.db_password.result
+            }),
+            opts=child_opts
         )
 
         self.db_proxy = aws.rds.Proxy(
@@ -281,8 +277,9 @@ class RdsDb(pulumi.ComponentResource):
                 secret_arn=self.db_proxy_secret.arn,
             )],
             tags=self.base_tags,
-            opts=pulumi.ResourceOptions(
-                parent=self
+            opts=pulumi.ResourceOptions.merge(
+                child_opts,
+                pulumi.ResourceOptions(depends_on=[db_proxy_role_policy])
             )
         )
 
@@ -295,18 +292,21 @@ class RdsDb(pulumi.ComponentResource):
                 max_idle_connections_percent=50,
                 session_pinning_filters=["EXCLUDE_VARIABLE_SETS"],
             ),
-	        opts=pulumi.ResourceOptions(
-                parent=self
-            )
+            opts=child_opts
         )
 
+        # The proxy name is set explicitly above and the default target group
+        # is always named `default`, so only the ordering is expressed as a
+        # dependency. The cluster identifier is generated from a prefix and
+        # still has to be read from the cluster.
         self.db_proxy_target = aws.rds.ProxyTarget(
             f"{self.name}-db-proxy-target-group",
-            db_proxy_name=self.db_proxy.name,
+            db_proxy_name=f"{self.name}-db-proxy",
             db_cluster_identifier=self.serverless_db.cluster_identifier,
-            target_group_name=self.db_proxy_default_target.name,
-            opts=pulumi.ResourceOptions(
-                parent=self
+            target_group_name="default",
+            opts=pulumi.ResourceOptions.merge(
+                child_opts,
+                pulumi.ResourceOptions(depends_on=[self.db_proxy_default_target])
             )
         )
 
@@ -317,12 +317,13 @@ class RdsDb(pulumi.ComponentResource):
             vpc_subnet_ids=self.private_subnets,
             vpc_security_group_ids=[self.db_security_group.id],
             target_role="READ_WRITE",
-            opts=pulumi.ResourceOptions(
-                parent=self
-            ),
+            opts=child_opts,
             tags=self.base_tags
         )
 
+        # Route 53 changes cannot be batched through the provider, each record
+        # is its own ChangeResourceRecordSets call. The two records share no
+        # Output besides the zone id, so the engine issues them concurrently.
         self.db_record = aws.route53.Record(
             f"{self.name}-db-record",
             zone_id=self.zone_id,
@@ -332,9 +333,7 @@ class RdsDb(pulumi.ComponentResource):
             records=[
                 self.serverless_db.endpoint
             ],
-            opts=pulumi.ResourceOptions(
-                parent=self
-            )
+            opts=child_opts
         )
 
         self.db_proxy_record = aws.route53.Record(
@@ -346,9 +345,7 @@ class RdsDb(pulumi.ComponentResource):
             records=[
                 self.db_proxy_endpoint.endpoint
             ],
-            opts=pulumi.ResourceOptions(
-                parent=self
-            )
+            opts=child_opts
         )
 
         super().register_outputs({})
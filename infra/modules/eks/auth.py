@@ -1,9 +1,22 @@
 """ Pulumi resources for Kubernetes authorization."""
+import json
+
 import pulumi
 import pulumi_kubernetes as k
-import yaml
 from typing import Optional, Sequence
 
+# Groups granted to every cluster admin user
+_MASTERS_GROUPS = ('system:masters',)
+
+# Mapping of the worker node role, completed with the role arn
+_NODE_ROLE_TEMPLATE = {
+    'username': 'system:node:{{EC2PrivateDNSName}}',
+    'groups': (
+        'system:bootstrappers',
+        'system:nodes'
+    )
+}
+
 
 class KAuthArgs:
     def __init__(self,
@@ -38,15 +51,15 @@ class KAuth(pulumi.ComponentResource):
         self.admin_users = [
             {
                 'userarn': u,
-                'username': u.split('/')[-1],
-                'groups': [
-                    'system:masters'
-                ]
+                'username': u.rpartition('/')[2],
+                'groups': _MASTERS_GROUPS
             } for u in args.admin_users
         ]
 
         # Create required configmap
         # (https://docs.aws.amazon.com/eks/latest/userguide/add-user-role.html)
+        # The mappings are stored as JSON, which the authenticator reads
+        # as the YAML it is a subset of
         self.cm_auth = k.core.v1.ConfigMap(
             f"{self.name}-auth-cm",
             metadata=k.meta.v1.ObjectMetaArgs(
@@ -54,8 +67,8 @@ class KAuth(pulumi.ComponentResource):
                 namespace='kube-system'
             ),
             data={
-                "mapRoles": args.worker_role_arn.apply(lambda r: yaml.dump(self.get_node_role(r))),
-                "mapUsers": yaml.dump(self.admin_users)
+                "mapRoles": pulumi.Output.json_dumps(self.get_node_role(args.worker_role_arn)),
+                "mapUsers": json.dumps(self.admin_users)
             },
             opts=pulumi.ResourceOptions(
                 parent=self
@@ -64,15 +77,5 @@ class KAuth(pulumi.ComponentResource):
 
     @staticmethod
     def get_node_role(r):
-        node_role = [
-            {
-                'rolearn': r,
-                'username': 'system:node:{{EC2PrivateDNSName}}',
-                'groups': [
-                    'system:bootstrappers',
-                    'system:nodes'
-                ]
-            }
-        ]
-        return node_role
+        return [{'rolearn': r, **_NODE_ROLE_TEMPLATE}]
 
@@ -1,62 +1,146 @@
 
+from dataclasses import dataclass
 from typing import Mapping, Sequence
 import json
 import base64
 import pulumi
 import pulumi_aws as aws
-import pulumi_tls as tls
+
+# SHA-1 thumbprint of the root CA of the EKS OIDC issuers. IAM validates
+# EKS issuers against its own trusted CAs, so a fixed value saves a TLS
+# lookup of the issuer on every run.
+EKS_OIDC_THUMBPRINT = '9e99a48a9960b14926bb7f3b02e22da2b0ab7280'
+
+# Managed policies attached to the cluster and node roles, keyed by the
+# name of their attachment resource. Each attachment stays its own
+# resource, so policies can be added or removed without touching the others.
+_CLUSTER_ROLE_POLICIES = (
+    ('eks-service-policy-attachment', 'arn:aws:iam::aws:policy/AmazonEKSServicePolicy'),
+    ('eks-cluster-policy-attachment', 'arn:aws:iam::aws:policy/AmazonEKSClusterPolicy'),
+)
+
+_NODE_ROLE_POLICIES = (
+    ('eks-workernode-policy-attachment', 'arn:aws:iam::aws:policy/AmazonEKSWorkerNodePolicy'),
+    ('eks-cni-policy-attachment', 'arn:aws:iam::aws:policy/AmazonEKS_CNI_Policy'),
+    ('ec2-container-ro-policy-attachment', 'arn:aws:iam::aws:policy/AmazonEC2ContainerRegistryReadOnly'),
+    ('ec2-ebs-csi-policy-attachment', 'arn:aws:iam::aws:policy/service-role/AmazonEBSCSIDriverPolicy'),
+    ('ssm-session-policy-attachment', 'arn:aws:iam::aws:policy/AmazonSSMManagedInstanceCore'),
+)
+
+
+def _service_assume_role_policy(service):
+    """
+    Trust policy letting an AWS service assume a role.
+    """
+    return json.dumps({
+        'Version': '2012-10-17',
+        'Statement': [
+            {
+                'Action': 'sts:AssumeRole',
+                'Principal': {
+                    'Service': service
+                },
+                'Effect': 'Allow',
+                'Sid': ''
+            }
+        ],
+    })
+
+
+_EKS_ASSUME_ROLE_POLICY = _service_assume_role_policy('eks.amazonaws.com')
+_EC2_ASSUME_ROLE_POLICY = _service_assume_role_policy('ec2.amazonaws.com')
+
+# Bootstrap script of the worker nodes, formatted with the cluster
+# endpoint, CA data and cluster name. The node group only runs on-demand
+# instances, so the lifecycle label is fixed instead of read from IMDS.
+_NODE_USER_DATA = (
+    "#!/bin/bash\n"
+    "set -o xtrace\n"
+    "/etc/eks/bootstrap.sh --apiserver-endpoint '{endpoint}' --kubelet-extra-args"
+    " --node-labels=node.kubernetes.io/lifecycle=on-demand"
+    " --b64-cluster-ca '{ca}' '{cluster_name}'\n"
+)
+
+# Permissions of the cluster-autoscaler service account
+_AUTOSCALER_POLICY = json.dumps({
+    "Version": "2012-10-17",
+    "Statement": [
+        {
+            "Action": [
+                "autoscaling:DescribeAutoScalingGroups",
+                "autoscaling:DescribeAutoScalingInstances",
+                "autoscaling:DescribeLaunchConfigurations",
+                "autoscaling:DescribeTags",
+                "autoscaling:SetDesiredCapacity",
+                "autoscaling:TerminateInstanceInAutoScalingGroup",
+                "ec2:DescribeLaunchTemplateVersions"
+            ],
+            "Resource": "*",
+            "Effect": "Allow"
+        }
+    ]
+})
+
+
+def _autoscaler_trust_policy(oidc_arn: str) -> str:
+    """
+    Trust policy letting the cluster-autoscaler service account assume its
+    role through the cluster OIDC provider.
+
+    :param oidc_arn: Arn of the OIDC provider, its path is the issuer host.
+    """
+    return json.dumps({
+        'Version': '2012-10-17',
+        'Statement': [{
+            'Effect': 'Allow',
+            'Principal': {
+                'Federated': oidc_arn
+            },
+            'Action': 'sts:AssumeRoleWithWebIdentity',
+            'Condition': {
+                'StringEquals': {
+                    f"{oidc_arn.split('/', 1)[1]}:sub":
+                        'system:serviceaccount:kube-system:cluster-autoscaler'
+                }
+            }
+        }]
+    })
 
 
 # EKS Cluster
+@dataclass(frozen=True)
 class EksArgs:
     """
     The arguments necessary to construct a `EKS` resource.
-    """
 
-    def __init__(self,
-                 base_tags: Mapping[str, str],
-                 default_certificate_arn: pulumi.Input[str],
-                 eks_version: pulumi.Input[str],
-                 private_subnet_ids: pulumi.Input[Sequence[pulumi.Input[str]]],
-                 public_subnet_ids: pulumi.Input[Sequence[pulumi.Input[str]]],
-                 vpc_id: pulumi.Input[str],
-                 worker_image_id: pulumi.Input[str],
-                 worker_key_name: pulumi.Input[str],
-                 private_endpoint: pulumi.Input[bool] = False,
-                 public_endpoint: pulumi.Input[bool] = False,
-                 worker_instance_type: pulumi.Input[str] = 't2.medium',
-                 worker_max_size: pulumi.Input[int] = 10,
-                 worker_min_size: pulumi.Input[int] = 2
-                 ):
-        """
-        Constructs an EksArgs.
-
-        :param base_tags: Tags which are applied to all taggable resources.
-        :param default_certificate_arn: Arn of the certificate used by the load balancer.
-        :param eks_version: EKS version of the cluster
-        :param private_subnet_ids: the private subnets for the nodes to be deployed
-        :param private_subnet_ids: the public subnets for the Load Balancer to be deployed
-        :param vpc_id: The VPC id for this deployment
-        :param worker_image_id: AMI image for the nodes
-        :param worker_instance_type: EC2 instance type for the nodes
-        :param worker_key_name: Key pair for the nodes
-        :param worker_max_size: Worker Autoscaling maximum size
-        :param worker_max_size: Worker Autoscaling minimum size
-        """
+    :param base_tags: Tags which are applied to all taggable resources.
+    :param default_certificate_arn: Arn of the certificate used by the load balancer.
+    :param eks_version: EKS version of the cluster
+    :param private_subnet_ids: the private subnets for the nodes to be deployed
+    :param public_subnet_ids: the public subnets for the Load Balancer to be deployed
+    :param vpc_id: The VPC id for this deployment
+    :param worker_image_id: AMI image for the nodes
+    :param worker_key_name: Key pair for the nodes
+    :param private_endpoint: Enable the private API server endpoint
+    :param public_endpoint: Enable the public API server endpoint
+    :param worker_instance_type: EC2 instance type for the nodes
+    :param worker_max_size: Worker Autoscaling maximum size
+    :param worker_min_size: Worker Autoscaling minimum size
+    """
 
-        self.base_tags = base_tags
-        self.default_certificate_arn = default_certificate_arn
-        self.eks_version = eks_version
-        self.private_endpoint = private_endpoint
-        self.private_subnet_ids = private_subnet_ids
-        self.public_subnet_ids = public_subnet_ids
-        self.public_endpoint = public_endpoint
-        self.vpc_id = vpc_id
-        self.worker_image_id = worker_image_id
-        self.worker_instance_type = worker_instance_type
-        self.worker_key_name = worker_key_name
-        self.worker_max_size = worker_max_size
-        self.worker_min_size = worker_min_size
+    base_tags: Mapping[str, str]
+    default_certificate_arn: pulumi.Input[str]
+    eks_version: pulumi.Input[str]
+    private_subnet_ids: pulumi.Input[Sequence[pulumi.Input[str]]]
+    public_subnet_ids: pulumi.Input[Sequence[pulumi.Input[str]]]
+    vpc_id: pulumi.Input[str]
+    worker_image_id: pulumi.Input[str]
+    worker_key_name: pulumi.Input[str]
+    private_endpoint: pulumi.Input[bool] = False
+    public_endpoint: pulumi.Input[bool] = False
+    worker_instance_type: pulumi.Input[str] = 't2.medium'
+    worker_max_size: pulumi.Input[int] = 10
+    worker_min_size: pulumi.Input[int] = 2
 
 
 class EKS(pulumi.ComponentResource):
@@ -79,139 +163,87 @@ class EKS(pulumi.ComponentResource):
 
         # Make base info available to other methods
         self.name = name
-        self.base_tags = args.base_tags
-        self.default_certificate_arn = args.default_certificate_arn
-        self.eks_version = args.eks_version
-        self.private_endpoint = args.private_endpoint
-        self.private_subnet_ids = args.private_subnet_ids
-        self.public_endpoint = args.public_endpoint
-        self.public_subnet_ids = args.public_subnet_ids
-        self.worker_image_id = args.worker_image_id
-        self.worker_instance_type = args.worker_instance_type
-        self.worker_key_name = args.worker_key_name
-        self.worker_max_size = args.worker_max_size
-        self.worker_min_size = args.worker_min_size
-        self.vpc_id = args.vpc_id
-
-        # IAM #
+        self._args = args
+
+        # Common prefix of the child resource names
+        self._prefix = self.name + '-'
+        self.cluster_name = self._prefix + 'eks-cluster'
+
+        # Options shared by the child resources parented to the component
+        self._child_opts = pulumi.ResourceOptions(parent=self)
+
+        eks_role = self._create_iam()
+        eks_node_sec_grp = self._create_security_groups()
+        self._create_cluster(eks_role)
+        eks_alb_tg = self._create_alb()
+        eks_node_autoscaling = self._create_nodegroup(eks_node_sec_grp, eks_alb_tg)
+        self._create_autoscaler(eks_node_autoscaling)
+
+        super().register_outputs({})
+
+    def _tags(self, name: str) -> Mapping[str, str]:
+        """
+        Returns the base tags with a `Name` tag added.
+
+        :param name: The value of the `Name` tag.
+        """
+        return {'Name': name, **self._args.base_tags}
+
+    def _create_iam(self) -> aws.iam.Role:
+        """
+        Creates the cluster and node group roles.
+
+        :return: The role of the EKS control plane.
+        """
+        args = self._args
 
         eks_role = aws.iam.Role(
             'eks-iam-role',
-            assume_role_policy=json.dumps({
-                'Version': '2012-10-17',
-                'Statement': [
-                    {
-                        'Action': 'sts:AssumeRole',
-                        'Principal': {
-                            'Service': 'eks.amazonaws.com'
-                        },
-                        'Effect': 'Allow',
-                        'Sid': ''
-                    }
-                ],
-            }),
-            tags=self.base_tags,
-            opts=pulumi.ResourceOptions(
-                parent=self
-            )
+            assume_role_policy=_EKS_ASSUME_ROLE_POLICY,
+            tags=args.base_tags,
+            opts=self._child_opts
         )
 
-        aws.iam.RolePolicyAttachment(
-            'eks-service-policy-attachment',
-            role=eks_role.id,
-            policy_arn='arn:aws:iam::aws:policy/AmazonEKSServicePolicy',
-            opts=pulumi.ResourceOptions(
-                parent=self
-            )
-        )
-
-        aws.iam.RolePolicyAttachment(
-            'eks-cluster-policy-attachment',
-            role=eks_role.id,
-            policy_arn='arn:aws:iam::aws:policy/AmazonEKSClusterPolicy',
-            opts=pulumi.ResourceOptions(
-                parent=self
+        for attachment_name, policy_arn in _CLUSTER_ROLE_POLICIES:
+            aws.iam.RolePolicyAttachment(
+                attachment_name,
+                role=eks_role.id,
+                policy_arn=policy_arn,
+                opts=self._child_opts
             )
-        )
 
         # Ec2 NodeGroup Role
 
         self.ec2_role = aws.iam.Role(
             'ec2-nodegroup-iam-role',
-            assume_role_policy=json.dumps({
-                'Version': '2012-10-17',
-                'Statement': [
-                    {
-                        'Action': 'sts:AssumeRole',
-                        'Principal': {
-                            'Service': 'ec2.amazonaws.com'
-                        },
-                        'Effect': 'Allow',
-                        'Sid': ''
-                    }
-                ],
-            }),
-            tags=self.base_tags,
-            opts=pulumi.ResourceOptions(
-                parent=self
-            )
+            assume_role_policy=_EC2_ASSUME_ROLE_POLICY,
+            tags=args.base_tags,
+            opts=self._child_opts
         )
 
-        aws.iam.RolePolicyAttachment(
-            'eks-workernode-policy-attachment',
-            role=self.ec2_role.id,
-            policy_arn='arn:aws:iam::aws:policy/AmazonEKSWorkerNodePolicy',
-            opts=pulumi.ResourceOptions(
-                parent=self
+        for attachment_name, policy_arn in _NODE_ROLE_POLICIES:
+            aws.iam.RolePolicyAttachment(
+                attachment_name,
+                role=self.ec2_role.id,
+                policy_arn=policy_arn,
+                opts=self._child_opts
             )
-        )
 
-        aws.iam.RolePolicyAttachment(
-            'eks-cni-policy-attachment',
-            role=self.ec2_role.id,
-            policy_arn='arn:aws:iam::aws:policy/AmazonEKS_CNI_Policy',
-            opts=pulumi.ResourceOptions(
-                parent=self
-            )
-        )
-
-        aws.iam.RolePolicyAttachment(
-            'ec2-container-ro-policy-attachment',
-            role=self.ec2_role.id,
-            policy_arn='arn:aws:iam::aws:policy/AmazonEC2ContainerRegistryReadOnly',
-            opts=pulumi.ResourceOptions(
-                parent=self
-            )
-        )
+        return eks_role
 
-        aws.iam.RolePolicyAttachment(
-            'ec2-ebs-csi-policy-attachment',
-            role=self.ec2_role.id,
-            policy_arn='arn:aws:iam::aws:policy/service-role/AmazonEBSCSIDriverPolicy',
-            opts=pulumi.ResourceOptions(
-                parent=self
-            )
-        )
-
-        aws.iam.RolePolicyAttachment(
-            'ssm-session-policy-attachment',
-            role=self.ec2_role.id,
-            policy_arn='arn:aws:iam::aws:policy/AmazonSSMManagedInstanceCore',
-            opts=pulumi.ResourceOptions(
-                parent=self
-            )
-        )
+    def _create_security_groups(self) -> aws.ec2.SecurityGroup:
+        """
+        Creates the security groups of the control plane and the worker nodes.
 
-        # Security Groups #
+        :return: The security group of the worker nodes.
+        """
+        args = self._args
 
         self.eks_security_group = aws.ec2.SecurityGroup(
             'eks-cluster-sg',
-            vpc_id=self.vpc_id,
+            vpc_id=args.vpc_id,
             description='Allow all HTTP(s) traffic to EKS Cluster',
-            tags={
-                'Name': 'eks-cluster-sg',
-                **self.base_tags
-            },
+            tags=self._tags('eks-cluster-sg'),
             ingress=[
                 aws.ec2.SecurityGroupIngressArgs(
                     cidr_blocks=['0.0.0.0/0'],
@@ -228,13 +260,85 @@ class EKS(pulumi.ComponentResource):
                     description='Allow internet access to pods'
                 )
             ],
-            opts=pulumi.ResourceOptions(
-                parent=self
-            )
+            opts=self._child_opts
+        )
+
+        eks_node_sec_grp = aws.ec2.SecurityGroup(
+            self._prefix + 'node-sec-grp',
+            vpc_id=args.vpc_id,
+            description='Security group for EKS Cluster nodes',
+            egress=[
+                aws.ec2.SecurityGroupEgressArgs(
+                    from_port=0,
+                    to_port=0,
+                    protocol="-1",
+                    cidr_blocks=["0.0.0.0/0"]
+                )
+            ],
+            tags=self._tags('eks-cluster-node-sg'),
+            opts=self._child_opts)
+
+        # The node rules are parented to the node security group
+        node_sg_opts = pulumi.ResourceOptions(parent=eks_node_sec_grp)
+
+        aws.ec2.SecurityGroupRule(
+            self._prefix + 'node-sec-grp-self',
+            type="ingress",
+            from_port=0,
+            to_port=0,
+            protocol='-1',
+            description='Allow node to communicate with each other',
+            security_group_id=eks_node_sec_grp.id,
+            source_security_group_id=eks_node_sec_grp.id,
+            opts=node_sg_opts
+        )
+                    
+        aws.ec2.SecurityGroupRule(
+            self._prefix + 'node-sec-grp-cluster',
+            type="ingress",
+            from_port=0,
+            to_port=0,
+            protocol='-1',
+            security_group_id=eks_node_sec_grp.id,
+            source_security_group_id=self.eks_security_group.id,
+            description='Allow worker Kubelets and pods to receive communication from the cluster control plane',
+            opts=node_sg_opts
+        )
+
+        aws.ec2.SecurityGroupRule(
+            self._prefix + 'node-sec-grp-ssh',
+            type="ingress",
+            from_port=22,
+            to_port=22,
+            protocol='tcp',
+            security_group_id=eks_node_sec_grp.id,
+            cidr_blocks=['10.0.0.0/8'],
+            description='Allow ssh from vpc',
+            opts=node_sg_opts
+        )
+
+        aws.ec2.SecurityGroupRule(
+            self._prefix + 'node-sec-grp-app',
+            type="ingress",
+            from_port=30000,
+            to_port=32800,
+            protocol='tcp',
+            security_group_id=eks_node_sec_grp.id,
+            cidr_blocks=['10.0.0.0/8'],
+            description='Allow app access from vpc',
+            opts=node_sg_opts
         )
 
-        # EKS Cluster #
-        cluster_name = f'{self.name}-eks-cluster'
+        return eks_node_sec_grp
+
+    def _create_cluster(self, eks_role: aws.iam.Role) -> None:
+        """
+        Creates the EKS control plane and its OIDC provider.
+
+        :param eks_role: The role assumed by the control plane.
+        """
+        args = self._args
+
         self.eks_cluster = aws.eks.Cluster(
             'eks-cluster',
             enabled_cluster_log_types=[
@@ -244,39 +348,28 @@ class EKS(pulumi.ComponentResource):
                 'controllerManager',
                 'scheduler'
             ],
-            name=cluster_name,
+            name=self.cluster_name,
             role_arn=eks_role.arn,
-            tags={
-                'Name': cluster_name,
-                **self.base_tags
-            },
+            tags=self._tags(self.cluster_name),
             vpc_config=aws.eks.ClusterVpcConfigArgs(
                 public_access_cidrs=['0.0.0.0/0'],
-                endpoint_private_access=True if self.private_endpoint else False,
-                endpoint_public_access=True if self.public_endpoint else False,
+                endpoint_private_access=bool(args.private_endpoint),
+                endpoint_public_access=bool(args.public_endpoint),
                 security_group_ids=[self.eks_security_group.id],
-                subnet_ids=self.private_subnet_ids,
+                subnet_ids=args.private_subnet_ids,
             ),
-            version=self.eks_version,
-            opts=pulumi.ResourceOptions(
-                parent=self
-            )
+            version=args.eks_version,
+            opts=self._child_opts
         )
 
-        cluster_certificate = self.eks_cluster.identities.apply(
-            lambda identities: tls.get_certificate(
-                url=identities[0].oidcs[0].issuer
-            )
-        )
-        
         self.openid_connector = aws.iam.OpenIdConnectProvider(
-            f'{self.name}-oidc-provider',
+            self._prefix + 'oidc-provider',
             client_id_lists=['sts.amazonaws.com'],
             thumbprint_lists=[
-                cluster_certificate.certificates[0].sha1_fingerprint
+                EKS_OIDC_THUMBPRINT
             ],
             url=self.eks_cluster.identities[0].oidcs[0].issuer,
-            tags=self.base_tags,
+            tags=args.base_tags,
             opts=pulumi.ResourceOptions(
                 parent=self.eks_cluster
             )
@@ -291,10 +384,17 @@ class EKS(pulumi.ComponentResource):
         #    )
         #)
 
-        # Load Balancer
+    def _create_alb(self) -> aws.lb.TargetGroup:
+        """
+        Creates the application load balancer in front of the worker nodes.
+
+        :return: The target group the worker nodes register in.
+        """
+        args = self._args
+
         eks_load_balancer_sec_grp = aws.ec2.SecurityGroup(
-            f'{self.name}-alb-sec-grp',
-            vpc_id=self.vpc_id,
+            self._prefix + 'alb-sec-grp',
+            vpc_id=args.vpc_id,
             description='Security group for EKS Cluster nodes',
             tags={
                 'Name': 'eks-alb-sg',
@@ -323,23 +423,19 @@ class EKS(pulumi.ComponentResource):
                     protocol="-1"
                 )
             ],
-            opts=pulumi.ResourceOptions(
-                parent=self
-            )
+            opts=self._child_opts
         )
 
         self.eks_alb = aws.lb.LoadBalancer(
-            f'{self.name}-eks-lb',
+            self._prefix + 'eks-lb',
             load_balancer_type='application',
             security_groups=[eks_load_balancer_sec_grp.id],
-            subnets=self.public_subnet_ids,
-            opts=pulumi.ResourceOptions(
-                parent=self
-            )
+            subnets=args.public_subnet_ids,
+            opts=self._child_opts
         )
 
         eks_alb_tg = aws.lb.TargetGroup(
-            f'{self.name}-eks-lb-tg',
+            self._prefix + 'eks-lb-tg',
             health_check=aws.lb.TargetGroupHealthCheckArgs(
                 path='/ping',
                 port="30900",
@@ -347,14 +443,12 @@ class EKS(pulumi.ComponentResource):
             ),
             port=32080,
             protocol="HTTP",
-            vpc_id=self.vpc_id,
-            opts=pulumi.ResourceOptions(
-                parent=self
-            )
+            vpc_id=args.vpc_id,
+            opts=self._child_opts
         )
 
         eks_alb_http_listener = aws.lb.Listener(
-            f'{self.name}-eks-lb-http-listener',
+            self._prefix + 'eks-lb-http-listener',
             load_balancer_arn=self.eks_alb.arn,
             port=80,
             protocol='HTTP',
@@ -368,120 +462,52 @@ class EKS(pulumi.ComponentResource):
                     )
                 )
             ],
-            opts=pulumi.ResourceOptions(
-                parent=self
-            )
+            opts=self._child_opts
         )
 
         self.elk_alb_https_listener = aws.lb.Listener(
-            f'{self.name}-eks-lb-https-listener',
+            self._prefix + 'eks-lb-https-listener',
             load_balancer_arn=self.eks_alb.arn,
             port=443,
             protocol='HTTPS',
             ssl_policy="ELBSecurityPolicy-2016-08",
-            certificate_arn=self.default_certificate_arn,
+            certificate_arn=args.default_certificate_arn,
             default_actions=[aws.lb.ListenerDefaultActionArgs(
                 type="forward",
                 target_group_arn=eks_alb_tg.arn,
             )],
-            opts=pulumi.ResourceOptions(
-                parent=self
-            )
+            opts=self._child_opts
         )
-        # Using EC2 Autoscaling #
 
-        eks_node_sec_grp = aws.ec2.SecurityGroup(
-            f'{self.name}-node-sec-grp',
-            vpc_id=self.vpc_id,
-            description='Security group for EKS Cluster nodes',
-            egress=[
-                aws.ec2.SecurityGroupEgressArgs(
-                    from_port=0,
-                    to_port=0,
-                    protocol="-1",
-                    cidr_blocks=["0.0.0.0/0"]
-                )
-            ],
-            tags={
-                'Name': 'eks-cluster-node-sg',
-                **self.base_tags,
-            },
-            opts=pulumi.ResourceOptions(
-                parent=self
-            ))
+        return eks_alb_tg
 
-        aws.ec2.SecurityGroupRule(
-            f'{self.name}-node-sec-grp-self',
-            type="ingress",
-            from_port=0,
-            to_port=0,
-            protocol='-1',
-            description='Allow node to communicate with each other',
-            security_group_id=eks_node_sec_grp.id,
-            source_security_group_id=eks_node_sec_grp.id,
-            opts=pulumi.ResourceOptions(
-                parent=eks_node_sec_grp
-            )
-        )
-                    
-        aws.ec2.SecurityGroupRule(
-            f'{self.name}-node-sec-grp-cluster',
-            type="ingress",
-            from_port=0,
-            to_port=0,
-            protocol='-1',
-            security_group_id=eks_node_sec_grp.id,
-            source_security_group_id=self.eks_security_group.id,
-            description='Allow worker Kubelets and pods to receive communication from the cluster control plane',
-            opts=pulumi.ResourceOptions(
-                parent=eks_node_sec_grp
-            )
-        )
-
-        aws.ec2.SecurityGroupRule(
-            f'{self.name}-node-sec-grp-ssh',
-            type="ingress",
-            from_port=22,
-            to_port=22,
-            protocol='tcp',
-            security_group_id=eks_node_sec_grp.id,
-            cidr_blocks=['10.0.0.0/8'],
-            description='Allow ssh from vpc',
-            opts=pulumi.ResourceOptions(
-                parent=eks_node_sec_grp
-            )
-        )
+    def _create_nodegroup(self,
+                          eks_node_sec_grp: aws.ec2.SecurityGroup,
+                          eks_alb_tg: aws.lb.TargetGroup) -> aws.autoscaling.Group:
+        """
+        Creates the worker nodes as an EC2 autoscaling group.
 
-        aws.ec2.SecurityGroupRule(
-            f'{self.name}-node-sec-grp-app',
-            type="ingress",
-            from_port=30000,
-            to_port=32800,
-            protocol='tcp',
-            security_group_id=eks_node_sec_grp.id,
-            cidr_blocks=['10.0.0.0/8'],
-            description='Allow app access from vpc',
-            opts=pulumi.ResourceOptions(
-                parent=eks_node_sec_grp
-            )
-        )
+        :param eks_node_sec_grp: The security group of the worker nodes.
+        :param eks_alb_tg: The load balancer target group of the worker nodes.
+        :return: The autoscaling group of the worker nodes.
+        """
+        args = self._args
+        cluster_name = self.cluster_name
 
         eks_node_instance_profile = aws.iam.InstanceProfile(
-            f'{self.name}-node-instance-profile',
+            self._prefix + 'node-instance-profile',
             role=self.ec2_role.name,
-            opts=pulumi.ResourceOptions(
-                parent=self
-            )
+            opts=self._child_opts
         )
 
         eks_node_launch_template = aws.ec2.LaunchTemplate(
-            f'{self.name}-node-launch-template',
+            self._prefix + 'node-launch-template',
             iam_instance_profile=aws.ec2.LaunchTemplateIamInstanceProfileArgs(
                 arn=eks_node_instance_profile.arn
             ),
-            image_id=self.worker_image_id,
-            instance_type=self.worker_instance_type,
-            key_name=self.worker_key_name,
+            image_id=args.worker_image_id,
+            instance_type=args.worker_instance_type,
+            key_name=args.worker_key_name,
             name_prefix=cluster_name,
             network_interfaces=[
                 aws.ec2.LaunchTemplateNetworkInterfaceArgs(
@@ -502,23 +528,25 @@ class EKS(pulumi.ComponentResource):
                     )
                 )
             ],
+            # Launch templates take their user data base64 encoded
             user_data=pulumi.Output.all(
-                self.eks_cluster.endpoint,
-                self.eks_cluster.certificate_authority.data,
-                cluster_name
-            ).apply(lambda args: base64.b64encode(f"""
-            #!/bin/bash
-            set -o xtrace
-            /etc/eks/bootstrap.sh --apiserver-endpoint '{args[0]}' --kubelet-extra-args --node-labels=node.kubernetes.io/lifecycle=`curl -s http://169.254.169.254/latest/meta-data/instance-life-cycle` --b64-cluster-ca '{args[1]}' '{args[2]}' 
-            """.encode()).decode()),
-            tags=self.base_tags,
-            opts=pulumi.ResourceOptions(
-                parent=self
-            )
+                endpoint=self.eks_cluster.endpoint,
+                ca=self.eks_cluster.certificate_authority.data
+            ).apply(lambda a: base64.b64encode(
+                _NODE_USER_DATA.format(cluster_name=cluster_name, **a).encode()
+            ).decode()),
+            tags=args.base_tags,
+            opts=self._child_opts
         )
 
+        asg_name = f"{cluster_name}-worker-node-asg"
+        worker_node_name = f"{cluster_name}-worker-node"
+        # Cluster ownership and cluster-autoscaler discovery tag keys
+        cluster_tag_key = f"kubernetes.io/cluster/{cluster_name}"
+        autoscaler_tag_key = f"k8s.io/cluster-autoscaler/{cluster_name}"
+
         eks_node_autoscaling = aws.autoscaling.Group(
-            f'{self.name}-node-asg',
+            self._prefix + 'node-asg',
             # desired_capacity=args.desired_capacity,
             instance_refresh=aws.autoscaling.GroupInstanceRefreshArgs(
                 strategy="Rolling"
@@ -527,23 +555,23 @@ class EKS(pulumi.ComponentResource):
                 id=eks_node_launch_template.id,
                 version="$Latest"
             ),
-            max_size=self.worker_max_size,
-            min_size=self.worker_min_size,
-            name=f"{cluster_name}-worker-node-asg",
-            vpc_zone_identifiers=self.private_subnet_ids,
+            max_size=args.worker_max_size,
+            min_size=args.worker_min_size,
+            name=asg_name,
+            vpc_zone_identifiers=args.private_subnet_ids,
             tags=[
                 aws.autoscaling.GroupTagArgs(
                     key="Name",
-                    value=f"{cluster_name}-worker-node",
+                    value=worker_node_name,
                     propagate_at_launch=True
                 ),
                 aws.autoscaling.GroupTagArgs(
-                    key=f"kubernetes.io/cluster/{cluster_name}",
+                    key=cluster_tag_key,
                     value="owned",
                     propagate_at_launch=True
                 ),
                 aws.autoscaling.GroupTagArgs(
-                    key=f"k8s.io/cluster-autoscaler/{cluster_name}",
+                    key=autoscaler_tag_key,
                     value="owned",
                     propagate_at_launch=True
                 ),
@@ -552,97 +580,60 @@ class EKS(pulumi.ComponentResource):
                     value="true",
                     propagate_at_launch=True
                 ),
-            ] + [
-                aws.autoscaling.GroupTagArgs(
-                    key=k,
-                    value=self.base_tags[k],
-                    propagate_at_launch=True
-                ) for k in self.base_tags.keys()
+                *(
+                    aws.autoscaling.GroupTagArgs(
+                        key=k,
+                        value=v,
+                        propagate_at_launch=True
+                    ) for k, v in args.base_tags.items()
+                )
             ],
             target_group_arns=[eks_alb_tg.arn],
-            opts=pulumi.ResourceOptions(
-                parent=self
-            )
+            opts=self._child_opts
         )
 
-        # Autoscaler #
+        return eks_node_autoscaling
+
+    def _create_autoscaler(self, eks_node_autoscaling: aws.autoscaling.Group) -> None:
+        """
+        Creates the cluster-autoscaler role and the CPU based scaling of the worker nodes.
+
+        :param eks_node_autoscaling: The autoscaling group of the worker nodes.
+        """
+        args = self._args
+
         eks_autoscaler_policy = aws.iam.Policy(
-            f'{self.name}-eks-autoscaler-policy',
-            policy=json.dumps({
-                "Version": "2012-10-17",
-                "Statement": [
-                    {
-                        "Action": [
-                            "autoscaling:DescribeAutoScalingGroups",
-                            "autoscaling:DescribeAutoScalingInstances",
-                            "autoscaling:DescribeLaunchConfigurations",
-                            "autoscaling:DescribeTags",
-                            "autoscaling:SetDesiredCapacity",
-                            "autoscaling:TerminateInstanceInAutoScalingGroup",
-                            "ec2:DescribeLaunchTemplateVersions"
-                        ],
-                        "Resource": "*",
-                        "Effect": "Allow"
-                    }
-                ]
-            }),
-            tags=self.base_tags,
-            opts=pulumi.ResourceOptions(
-                parent=self
-            )
+            self._prefix + 'eks-autoscaler-policy',
+            policy=_AUTOSCALER_POLICY,
+            tags=args.base_tags,
+            opts=self._child_opts
         )
 
         eks_autoscaler_role = aws.iam.Role(
-            f'{self.name}-eks-autoscaler-role',
-            assume_role_policy=self.openid_connector.arn.apply(lambda o: aws.iam.get_policy_document(
-                statements=[
-                    aws.iam.GetPolicyDocumentStatementArgs(
-                        effect="Allow",
-                        principals=[
-                            aws.iam.GetPolicyDocumentStatementPrincipalArgs(
-                                type='Federated',
-                                identifiers=[o]
-                            )
-                        ],
-                        actions=["sts:AssumeRoleWithWebIdentity"],
-                        conditions=[
-                            aws.iam.GetPolicyDocumentStatementConditionArgs(
-                                test='StringEquals',
-                                variable=f"{o.split('/',1)[1]}:sub",
-                                values=["system:serviceaccount:kube-system:cluster-autoscaler"]
-                            )
-                        ]
-                    )
-                ]
-            ).json),
-            tags=self.base_tags,
-            opts=pulumi.ResourceOptions(
-                parent=self
-            )
+            self._prefix + 'eks-autoscaler-role',
+            assume_role_policy=self.openid_connector.arn.apply(_autoscaler_trust_policy),
+            tags=args.base_tags,
+            opts=self._child_opts
         )
 
         aws.iam.RolePolicyAttachment(
-            f'{self.name}-eks-autoscaler-attach',
+            self._prefix + 'eks-autoscaler-attach',
             role=eks_autoscaler_role.name,
             policy_arn=eks_autoscaler_policy.arn,
-            opts=pulumi.ResourceOptions(
-                parent=self
-            )
+            opts=self._child_opts
         )
         
         self.eks_sc_policy = aws.autoscaling.Policy(
-            f"{self.name}-asg-policy",
+            self._prefix + 'asg-policy',
             scaling_adjustment=2,
             adjustment_type="ChangeInCapacity",
             cooldown=300,
             autoscaling_group_name=eks_node_autoscaling.name,
-            opts=pulumi.ResourceOptions(
-                parent=self
-            )
+            opts=self._child_opts
         )
 
         self.cpu_alarm = aws.cloudwatch.MetricAlarm(
-            f"{self.name}-eks-cpu-alarm",
+            self._prefix + 'eks-cpu-alarm',
             comparison_operator="GreaterThanOrEqualToThreshold",
             evaluation_periods=2,
             metric_name="CPUUtilization",
@@ -652,9 +643,5 @@ class EKS(pulumi.ComponentResource):
             threshold=60,
             alarm_actions=[self.eks_sc_policy.arn],
             dimensions={"AutoScalingGroupName": eks_node_autoscaling.name},
-            opts=pulumi.ResourceOptions(
-                parent=self
-            )
+            opts=self._child_opts
         )
-
-        super().register_outputs({})
@@ -2,40 +2,115 @@
 Contains a Pulumi ComponentResource for creating the infra resources
 for Kubernetes Resources.
 """
+from dataclasses import dataclass
 from typing import Mapping, Sequence, Any
 
 import json
-import yaml
+import os
 import pulumi
 import pulumi_aws as aws
 import pulumi_kubernetes as k8s
 
+from xpulumi import get_account_id, get_zone
+
+# Metric Server manifests, shipped next to this module and read once
+with open(os.path.join(os.path.dirname(__file__), 'metric_server.yaml')) as f:
+    _METRIC_SERVER_YAML = f.read()
+
+# Helm repositories of the charts released by the component
+_EBS_CSI_REPO = "https://kubernetes-sigs.github.io/aws-ebs-csi-driver"
+_TRAEFIK_REPO = "https://traefik.github.io/charts/"
+
+# Chart values of the Traefik release
+_TRAEFIK_VALUES = {
+    "ingressClass": {
+        "enabled": True,
+        "isDefaultClass": False},
+    "ingressRoute": {
+        "dashboard": {
+            "enabled": False,
+        }
+    },
+    "ports": {
+        "traefik": {
+            "expose": True,
+            "exposedPort": 9000,
+            "nodePort": 30900
+        },
+        "web": {
+            "expose": True,
+            "nodePort": 32080
+        }
+    },
+    "service": {
+        "type": "NodePort",
+    }
+}
+
+# Keeps the 30 most recent images of the ECR repository
+_ECR_LIFECYCLE_POLICY = json.dumps({
+    "rules": [
+        {
+            "rulePriority": 1,
+            "description": "Expire images count more than 30",
+            "selection": {
+                "tagStatus": "any",
+                "countType": "imageCountMoreThan",
+                "countNumber": 30
+            },
+            "action": {
+                "type": "expire"
+            }
+        }
+    ]
+}, separators=(',', ':'))
+
+# Hosted zone of the service records
+_ZONE_NAME = 'cloudlan.net'
+
+# The aws-auth mappings have a fixed shape, so they are written out directly
+# instead of going through a YAML emitter. Values are quoted as JSON strings,
+# which are valid YAML double-quoted scalars.
+_NODE_ROLE_YAML_TAIL = (
+    "  username: system:node:{{EC2PrivateDNSName}}\n"
+    "  groups:\n"
+    "  - system:bootstrappers\n"
+    "  - system:nodes\n"
+)
+
+_MASTERS_GROUPS_YAML = (
+    "  groups:\n"
+    "  - system:masters\n"
+)
+
+
+def _map_users_yaml(users: Sequence[str]) -> str:
+    """
+    Renders the mapUsers entries granting each user arn cluster admin.
+    """
+    return "".join(
+        f"- userarn: {json.dumps(u)}\n"
+        f"  username: {json.dumps(u.rpartition('/')[2])}\n"
+        + _MASTERS_GROUPS_YAML
+        for u in users
+    ) or "[]\n"
 
+
+@dataclass(frozen=True)
 class ServicesArgs:
     """
     The arguments necessary to construct `KubeServices` resource.
-    """
 
-    def __init__(self,
-                 base_tags: Mapping[str, str],
-                 ebs_csi_chart_version: pulumi.Input[str], 
-                 kube_users: Sequence[str],
-                 public_alb: pulumi.Input[str],
-                 vpc_id: pulumi.Input[str],
-                 worker_role_arn: pulumi.Input[str],
-                 traefik_chart_version: pulumi.Input[str] = "v23.2.0"):
-        """
-        Constructs a KubeServicesArgs.
+    :param base_tags: Tags which are applied to all taggable resources.
+    """
 
-        :param base_tags: Tags which are applied to all taggable resources.
-        """
-        self.base_tags = base_tags
-        self.ebs_csi_chart_version = ebs_csi_chart_version
-        self.kube_users = kube_users
-        self.public_alb = public_alb
-        self.traefik_chart_version = traefik_chart_version
-        self.vpc_id = vpc_id
-        self.worker_role_arn = worker_role_arn
+    base_tags: Mapping[str, str]
+    ebs_csi_chart_version: pulumi.Input[str]
+    kube_users: Sequence[str]
+    public_alb: pulumi.Input[str]
+    vpc_id: pulumi.Input[str]
+    worker_role_arn: pulumi.Input[str]
+    traefik_chart_version: pulumi.Input[str] = "v23.2.0"
 
 
 class ServicesResources(pulumi.ComponentResource):
@@ -59,26 +134,13 @@ class ServicesResources(pulumi.ComponentResource):
 
         # Make base info available to other methods
         self.name = name
-        self.account_id = aws.get_caller_identity().account_id
-        self.base_tags = args.base_tags
-        self.ebs_csi_chart_version = args.ebs_csi_chart_version
-        self.kube_users = args.kube_users
-        self.public_alb = args.public_alb
-        self.traefik_chart_version = args.traefik_chart_version
-        self.vpc_id = args.vpc_id
-        self.worker_role_arn = args.worker_role_arn
+        self.account_id = get_account_id()
+        self._args = args
 
-        # Auth
+        # Options shared by every child resource of the component
+        child_opts = pulumi.ResourceOptions(parent=self)
 
-        node_cluster_map_users = [
-            {
-                'userarn': user,
-                'username': user.split('/')[-1],
-                'groups': [
-                    'system:masters'
-                ]
-            } for user in self.kube_users
-        ]
+        # Auth
 
         self.cluster_auth = k8s.core.v1.ConfigMap(
             f"{self.name}-kauth",
@@ -87,20 +149,20 @@ class ServicesResources(pulumi.ComponentResource):
                 namespace="kube-system"
             ),
             data={
-                "mapRoles": self.worker_role_arn.apply(lambda r: self.get_node_roles(r)),
-                "mapUsers": yaml.dump(node_cluster_map_users)
+                "mapRoles": args.worker_role_arn.apply(lambda r: self.get_node_roles(r)),
+                "mapUsers": _map_users_yaml(args.kube_users)
             },
-            opts=pulumi.ResourceOptions(
-                parent=self
-            )
+            opts=child_opts
         )
 
-        # Deploy Metric Server from the URL
-        metric_server = k8s.yaml.ConfigFile(
+        # Deploy Metric Server from the bundled manifests. It used to be a
+        # ConfigFile, the alias keeps the existing objects adopted.
+        metric_server = k8s.yaml.ConfigGroup(
             f"{self.name}-metric-server",
-            file="metric_server.yaml",
-            opts=pulumi.ResourceOptions(
-                parent=self
+            yaml=[_METRIC_SERVER_YAML],
+            opts=pulumi.ResourceOptions.merge(
+                child_opts,
+                pulumi.ResourceOptions(aliases=[pulumi.Alias(type_="kubernetes:yaml:ConfigFile")])
             )
         )
         
@@ -112,14 +174,15 @@ class ServicesResources(pulumi.ComponentResource):
                 chart="aws-ebs-csi-driver",
                 namespace='kube-system',
                 repository_opts=k8s.helm.v3.RepositoryOptsArgs(
-                    repo="https://kubernetes-sigs.github.io/aws-ebs-csi-driver"
+                    repo=_EBS_CSI_REPO
                 ),
-                version=self.ebs_csi_chart_version,
-                values={}
+                version=args.ebs_csi_chart_version,
+                values={},
+                # The node DaemonSet only becomes ready as nodes roll, which
+                # the release does not need to wait for
+                skip_await=True
             ),
-            opts=pulumi.ResourceOptions(
-                parent=self
-            )
+            opts=child_opts
         )
 
         # Traefik
@@ -129,9 +192,7 @@ class ServicesResources(pulumi.ComponentResource):
             metadata=k8s.meta.v1.ObjectMetaArgs(
                 name='traefik'
             ),
-            opts=pulumi.ResourceOptions(
-                parent=self
-            )
+            opts=child_opts
         )
 
         self.traefik = k8s.helm.v3.Release(
@@ -140,36 +201,11 @@ class ServicesResources(pulumi.ComponentResource):
                 chart="traefik",
                 namespace=self.traefik_ns.metadata.name,
                 repository_opts=k8s.helm.v3.RepositoryOptsArgs(
-                    repo="https://traefik.github.io/charts/",
+                    repo=_TRAEFIK_REPO,
                 ),
-                version=self.traefik_chart_version,
-                values={
-                    "ingressClass": {
-                        "enabled": True,
-                        "isDefaultClass": False},
-                    "ingressRoute": {
-                        "dashboard": {
-                            "enabled": False,
-                        }
-                    },
-                    "ports": {
-                        "traefik": {
-                            "expose": True,
-                            "exposedPort": 9000,
-                            "nodePort": 30900
-                        },
-                        "web": {
-                            "expose": True,
-                            "nodePort": 32080
-                        }
-                    },
-                    "service": {
-                        "type": "NodePort",
-                    }
-                }),
-            opts=pulumi.ResourceOptions(
-                parent=self
-            )
+                version=args.traefik_chart_version,
+                values=_TRAEFIK_VALUES),
+            opts=child_opts
         )
 
         # ECR Repo
@@ -177,30 +213,13 @@ class ServicesResources(pulumi.ComponentResource):
         self.ecr_repo = aws.ecr.Repository(
             f"{self.name}-ecr-repository",
             name="demoapp",
-            opts=pulumi.ResourceOptions(
-                parent=self
-            )
+            opts=child_opts
         )
 
         aws.ecr.LifecyclePolicy(
             f"{self.name}-lifecycle-policy",
             repository=self.ecr_repo.name,
-            policy=json.dumps({
-                "rules": [
-                    {
-                        "rulePriority": 1,
-                        "description": "Expire images count more than 30",
-                        "selection": {
-                            "tagStatus": "any",
-                            "countType": "imageCountMoreThan",
-                            "countNumber": 30
-                        },
-                        "action": {
-                            "type": "expire"
-                        }
-                    }
-                ]
-            }),
+            policy=_ECR_LIFECYCLE_POLICY,
             opts=pulumi.ResourceOptions(
                 parent=self.ecr_repo
             )
@@ -213,12 +232,12 @@ class ServicesResources(pulumi.ComponentResource):
     def create_records(self, h):
         if h.get('create_records', True):
             nice_name = h.get('name').split('.')[0]
-            zone_name = 'cloudlan.net'
-            hz = aws.route53.get_zone(name=zone_name)
+            zone_name = _ZONE_NAME
+            hz = get_zone(zone_name)
             aws.route53.Record(
                 f"{self.name}-{nice_name}-record",
                 name=h['name'].replace(f".{zone_name}", ""),
-                records=[self.public_alb],
+                records=[self._args.public_alb],
                 ttl=300,
                 type='CNAME',
                 zone_id=hz.zone_id,
@@ -229,15 +248,5 @@ class ServicesResources(pulumi.ComponentResource):
             
     @staticmethod
     def get_node_roles(worker_role):
-        node_cluster_map_roles = [
-            {
-                'rolearn': worker_role,
-                'username': 'system:node:{{EC2PrivateDNSName}}',
-                'groups': [
-                    'system:bootstrappers',
-                    'system:nodes'
-                ]
-            },
-        ]
-        return yaml.dump(node_cluster_map_roles)
+        return f"- rolearn: {json.dumps(worker_role)}\n" + _NODE_ROLE_YAML_TAIL
 
@@ -1,23 +1,28 @@
-
 """
 Contains helper methods for building IAM policies.
 """
+import functools
 import json
 
 
-def assume_role_policy_for_principal(principal) -> str:
-    """
-    Creates a policy allowing the given principal to call the sts:AssumeRole
-    action.
-    :param any principal: The principal
-    """
+@functools.lru_cache(maxsize=None)
+def _assume_role_policy(principal_json: str) -> str:
     return json.dumps({
         "Version": "2012-10-17",
         "Statement": [
             {
                 "Effect": "Allow",
-                "Principal": principal,
+                "Principal": json.loads(principal_json),
                 "Action": "sts:AssumeRole"
             }
         ]
-    })
\ No newline at end of file
+    }, separators=(',', ':'))
+
+
+def assume_role_policy_for_principal(principal) -> str:
+    """
+    Creates a policy allowing the given principal to call the sts:AssumeRole
+    action. Policies are compact and built once per distinct principal.
+    :param any principal: The principal
+    """
+    return _assume_role_policy(json.dumps(principal, sort_keys=True, separators=(',', ':')))
@@ -3,6 +3,7 @@
 Contains a Pulumi ComponentResource for creating a good-practice AWS VPC.
 """
 import json
+from dataclasses import dataclass
 from typing import Mapping, Sequence
 
 import pulumi
@@ -13,35 +14,25 @@ from .iam_helpers import assume_role_policy_for_principal
 from .subnet_distributor import SubnetDistributor
 
 
+@dataclass(frozen=True)
 class VpcArgs:
     """
     The arguments necessary to construct a `Vpc` resource.
+
+    :param description: A human-readable description used to construct resource name tags.
+    :param base_tags: Tags which are applied to all taggable resources.
+    :param base_cidr: The CIDR block representing the address space of the entire VPC.
+    :param availability_zone_names: A list of availability zone names in which to create subnets.
+    :param zone_name: The name of a private Route 53 zone to create and set in a DHCP Option Set for the VPC.
+    :param create_s3_endpoint: Whether or not to create a VPC endpoint and routes for S3 access.
     """
 
-    def __init__(self,
-                 description: str,
-                 base_tags: Mapping[str, str],
-                 base_cidr: str,
-                 availability_zone_names: pulumi.Input[Sequence[pulumi.Input[str]]],
-                 zone_name: pulumi.Input[str] = "",
-                 create_s3_endpoint: bool = True):
-        """
-        Constructs a VpcArgs.
-
-        :param description: A human-readable description used to construct resource name tags.
-        :param base_tags: Tags which are applied to all taggable resources.
-        :param base_cidr: The CIDR block representing the address space of the entire VPC.
-        :param availability_zone_names: A list of availability zone names in which to create subnets.
-        :param zone_name: The name of a private Route 53 zone to create and set in a DHCP Option Set for the VPC.
-        :param create_s3_endpoint: Whether or not to create a VPC endpoint and routes for S3 access.
-        :param create_dynamodb_endpoint:  Whether or not to create a VPC endpoint and routes for DynamoDB access.
-        """
-        self.description = description
-        self.base_tags = base_tags
-        self.base_cidr = base_cidr
-        self.availability_zone_names = availability_zone_names
-        self.zone_name = zone_name
-        self.create_s3_endpoint = create_s3_endpoint
+    description: str
+    base_tags: Mapping[str, str]
+    base_cidr: str
+    availability_zone_names: pulumi.Input[Sequence[pulumi.Input[str]]]
+    zone_name: pulumi.Input[str] = ""
+    create_s3_endpoint: bool = True
 
 
 class Vpc(pulumi.ComponentResource):
@@ -71,8 +62,7 @@ class Vpc(pulumi.ComponentResource):
 
         # Make base info available to other methods
         self.name = name
-        self.description = args.description
-        self.base_tags = args.base_tags
+        self._args = args
 
         # Create VPC and Internet Gateway resources
         self.vpc = ec2.Vpc(f"{name}-vpc",
@@ -215,8 +205,8 @@ class Vpc(pulumi.ComponentResource):
         :return: None
         """
         self.flow_logs_role = iam.Role(f"{self.name}-flow-logs-role",
-                                       tags={**self.base_tags,
-                                             "Name": f"{self.description} VPC Flow Logs"},
+                                       tags={**self._args.base_tags,
+                                             "Name": f"{self._args.description} VPC Flow Logs"},
                                        assume_role_policy=assume_role_policy_for_principal({
                                            "Service": "vpc-flow-logs.amazonaws.com",
                                        }),
@@ -225,8 +215,8 @@ class Vpc(pulumi.ComponentResource):
                                        ))
 
         self.flow_logs_group = cloudwatch.LogGroup(f"{self.name}-vpc-flow-logs",
-                                                   tags={**self.base_tags,
-                                                         "Name": f"{self.description} VPC Flow Logs"},
+                                                   tags={**self._args.base_tags,
+                                                         "Name": f"{self._args.description} VPC Flow Logs"},
                                                    opts=pulumi.ResourceOptions(
                                                        parent=self.vpc,
                                                    ))
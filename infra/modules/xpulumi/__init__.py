@@ -0,0 +1,6 @@
+"""
+Shared helpers for the Pulumi stacks.
+"""
+
+from .invokes import *
+from .stacks import *
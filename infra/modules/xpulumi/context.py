@@ -0,0 +1,11 @@
+
+"""
+Contains the per-stack values every entry point starts from.
+"""
+import pulumi
+
+envName = pulumi.get_stack()
+config = pulumi.Config()
+BASE_TAGS = {
+    'Environment': envName
+}
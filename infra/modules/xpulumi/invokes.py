@@ -0,0 +1,67 @@
+
+"""
+Contains cached wrappers around provider data source lookups.
+"""
+import functools
+from typing import Tuple
+
+import pulumi
+import pulumi_aws as aws
+
+_lookups = {}
+
+
+def _once_per_program(fn):
+    """
+    Caches the result of a lookup per Pulumi program, the same way
+    `get_stack_reference` keys its references, so a later program in the same
+    process never gets an Output of an earlier one.
+    """
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        key = (pulumi.runtime.get_root_resource(), fn.__name__, args, tuple(sorted(kwargs.items())))
+        if key not in _lookups:
+            _lookups[key] = fn(*args, **kwargs)
+        return _lookups[key]
+    return wrapper
+
+
+@_once_per_program
+def get_zone(name: str) -> pulumi.Output[aws.route53.GetZoneResult]:
+    """
+    Looks up a Route 53 hosted zone by name. The lookup is only issued once per
+    zone name for the lifetime of the Pulumi program, and is resolved as an
+    Output so it does not block resource registrations while it is in flight.
+    :param name: The hosted zone name, e.g. `cloudlan.net`
+    """
+    return aws.route53.get_zone_output(name=name)
+
+
+@_once_per_program
+def get_rds_certificate(id: str) -> pulumi.Output[aws.rds.GetCertificateResult]:
+    """
+    Looks up an RDS CA certificate by id, once per id for the lifetime of the
+    Pulumi program.
+    :param id: The certificate identifier, e.g. `rds-ca-rsa2048-g1`
+    """
+    return aws.rds.get_certificate_output(id=id)
+
+
+@_once_per_program
+def get_account_id() -> pulumi.Output[str]:
+    """
+    Returns the id of the AWS account the program deploys to. The caller
+    identity is only looked up once for the lifetime of the Pulumi program.
+    """
+    return aws.get_caller_identity_output().account_id
+
+
+@_once_per_program
+def get_availability_zone_names(state: str = 'available') -> Tuple[str, ...]:
+    """
+    Returns the names of the availability zones of the current region. The
+    names are needed as plain values to lay out subnets, so the lookup is
+    synchronous, but it is only issued once per state.
+    :param state: Only return zones in this state
+    """
+    return tuple(aws.get_availability_zones(state=state).names)
@@ -0,0 +1,29 @@
+
+"""
+Contains helpers for reading outputs from other stacks.
+"""
+import pulumi
+
+_stack_references = {}
+
+
+def get_stack_reference(name: str) -> pulumi.StackReference:
+    """
+    Returns the StackReference for the given stack, registering it only the
+    first time it is requested in the current Pulumi program.
+    :param name: The fully qualified stack name, e.g. `organization/vpc/vpc-demo`
+    """
+    key = (pulumi.runtime.get_root_resource(), name)
+    if key not in _stack_references:
+        _stack_references[key] = pulumi.StackReference(name)
+    return _stack_references[key]
+
+
+def require_outputs(ref: pulumi.StackReference, *keys: str) -> pulumi.Output:
+    """
+    Reads several outputs of a referenced stack as a single Output holding a
+    dict of each key to its value.
+    :param ref: The StackReference to read from
+    :param keys: The names of the outputs, all of which must exist
+    """
+    return pulumi.Output.all(**{k: ref.require_output(k) for k in keys})
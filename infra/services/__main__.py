@@ -1,13 +1,9 @@
-import pulumi
 from svcs import ServicesResources, ServicesArgs
+from xpulumi import get_stack_reference
+from xpulumi.context import envName, config, BASE_TAGS
 
-envName = pulumi.get_stack()
-config = pulumi.Config()
-vpc_stack = pulumi.StackReference('organization/vpc/vpc-demo')
-k8s_stack = pulumi.StackReference('organization/eks/eks-demo')
-BASE_TAGS = {
-    'Environment': envName
-}
+vpc_stack = get_stack_reference('organization/vpc/vpc-demo')
+k8s_stack = get_stack_reference('organization/eks/eks-demo')
 
 svcs = ServicesResources(
     f"{envName}-svcs",
@@ -1,17 +1,11 @@
 import pulumi
-import pulumi_aws as aws
 from vpc import Vpc,VpcArgs
+from xpulumi import get_availability_zone_names
+from xpulumi.context import envName, config, BASE_TAGS
 
-envName = pulumi.get_stack()
-config = pulumi.Config()
-
-BASE_TAGS = {
-    "Environment": envName,
-}
-
-# Get first and last from all avaiable AZs
-zoneList = aws.get_availability_zones(state="available")
-zones = [zoneList.names[i] for i in (0,-1)]
+# Get first and last from all avaiable AZs, a single zone region gets it once
+names = get_availability_zone_names()
+zones = [names[0], names[-1]] if len(names) >= 2 else list(names[:1])
 
 vpc = Vpc(f"{envName}-vpc", VpcArgs(
     description=f"{envName} VPC",
@@ -25,6 +19,7 @@ vpc.enableFlowLoggingToCloudWatchLogs("ALL")
 
 pulumi.export("vpc_id", vpc.vpc.id)
 pulumi.export("vpc_cidr", config.require('vpc_cidr'))
-pulumi.export("public_subnet_ids", [subnet.id for subnet in vpc.public_subnets])
-pulumi.export("private_subnet_ids", [subnet.id for subnet in vpc.private_subnets])
-pulumi.export("nat_gateway_ips", [i.public_ip for i in vpc.nat_elastic_ip_addresses])
+# Each list is exported as a single Output rather than a list of Outputs
+pulumi.export("public_subnet_ids", pulumi.Output.all(*(subnet.id for subnet in vpc.public_subnets)))
+pulumi.export("private_subnet_ids", pulumi.Output.all(*(subnet.id for subnet in vpc.private_subnets)))
+pulumi.export("nat_gateway_ips", pulumi.Output.all(*(i.public_ip for i in vpc.nat_elastic_ip_addresses)))